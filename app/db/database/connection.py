@@ -1,10 +1,13 @@
 """
 Database Connection and Session Management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import Index, create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from typing import Generator
+from functools import lru_cache
+from typing import AsyncIterator, Generator, List, Tuple
 import logging
 
 from app.config import settings
@@ -12,6 +15,25 @@ from app.database.models import Base
 
 logger = logging.getLogger(__name__)
 
+# Asyncio driver for each supported database backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Map a database URL onto its asyncio driver, whatever sync driver it names
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for database backend '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
@@ -24,13 +46,91 @@ engine = create_engine(
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    Build the asyncio engine on first use.
+    Deployments whose URL has no asyncio driver keep working with the sync
+    engine; only callers of the async session path see the error.
+    """
+    return create_async_engine(
+        get_async_database_url(settings.database_url),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        echo=settings.debug,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    """
+    Session factory bound to the asyncio engine
+    """
+    return async_sessionmaker(
+        bind=get_async_engine(),
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+def _schema_drift(connection) -> Tuple[List[str], List[str], List[Index]]:
+    """
+    Compare the live schema with the models.
+    Returns the missing tables, the missing columns of existing tables and the
+    missing indexes of existing tables.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing_tables, missing_columns, missing_indexes = [], [], []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing_tables.append(table.name)
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing_columns.extend(
+            f"{table.name}.{column.name}" for column in table.columns
+            if column.name not in existing_columns
+        )
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing_indexes.extend(index for index in table.indexes if index.name not in existing_indexes)
+    return missing_tables, missing_columns, missing_indexes
+
+
+def has_tables() -> bool:
+    """
+    Check whether every model table already exists in the database
+    """
+    with engine.connect() as connection:
+        missing_tables, _, _ = _schema_drift(connection)
+    return not missing_tables
+
+
 def create_tables():
-    """Create all database tables"""
+    """
+    Create missing tables and indexes.
+    Columns added to a model after its table exists are only reported; they
+    need a manual migration.
+    """
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        with engine.begin() as connection:
+            missing_tables, missing_columns, missing_indexes = _schema_drift(connection)
+            if not (missing_tables or missing_columns or missing_indexes):
+                logger.info("Database schema is up to date, skipping creation")
+                return
+
+            if missing_tables:
+                Base.metadata.create_all(bind=connection)
+                logger.info("Created database tables: %s", ", ".join(missing_tables))
+            for index in missing_indexes:
+                index.create(bind=connection)
+                logger.info("Created database index: %s", index.name)
+            if missing_columns:
+                logger.warning(
+                    "Columns missing from existing tables, not migrated automatically: %s",
+                    ", ".join(missing_columns)
+                )
     except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
+        logger.error("Error creating database tables: %s", e)
         raise
 
 
@@ -42,16 +142,30 @@ def get_db() -> Generator[Session, None, None]:
     try:
         yield db
     except Exception as e:
-        logger.error(f"Database session error: {e}")
+        logger.error("Database session error: %s", e)
         db.rollback()
         raise
     finally:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get an async database session for handlers that await queries
+    """
+    async with get_async_sessionmaker()() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error("Database session error: %s", e)
+            await db.rollback()
+            raise
+
+
+@lru_cache(maxsize=1)
 def get_database_url() -> str:
     """
-    Get database URL from settings
+    Get database URL from settings (fixed for the life of the process)
     """
     return settings.database_url
 
@@ -61,11 +175,10 @@ def test_connection() -> bool:
     Test database connection
     """
     try:
-        from sqlalchemy import text
         with engine.connect() as connection:
             connection.execute(text("SELECT 1"))
         logger.info("Database connection successful")
         return True
     except Exception as e:
-        logger.error(f"Database connection failed: {e}")
+        logger.error("Database connection failed: %s", e)
         return False 
\ No newline at end of file
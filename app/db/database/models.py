@@ -4,7 +4,7 @@ Minimal schema as specified in PRD - only 4 tables
 """
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -69,6 +69,10 @@ class DocumentCache(Base):
 class AuditLog(Base):
     """Audit Logs Table"""
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Serves per-user history queries ordered by time (WHERE user_id ORDER BY timestamp)
+        Index("ix_audit_user_time", "user_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
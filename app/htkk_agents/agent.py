@@ -13,6 +13,7 @@ from google.adk.agents import Agent
 
 from .constants import MODEL_GEMINI_2_5_FLASH_LITE
 from .prompts import ROOT_AGENT_INSTRUCTION, ROOT_AGENT_DESCRIPTION
+from .router_fastpath import route_before_model
 from .sub_agents.form_agent import form_agent
 from .sub_agents.ocr_agent import ocr_agent
 
@@ -26,6 +27,7 @@ coordinator_agent = Agent(
         form_agent,
         ocr_agent
     ],  # Sub-agents for delegation - root agent only redirects
+    before_model_callback=route_before_model,  # Keyword fast path skips the LLM for obvious requests
     output_key="last_coordinator_response"
 )
 
@@ -8,6 +8,15 @@ MODEL_GEMINI_2_5_FLASH = "gemini-2.5-flash-lite"  # Alias for consistency
 MODEL_GEMINI_2_0_FLASH = "gemini-2.0-flash"
 MODEL_GEMINI_PRO = "gemini-2.0-pro"
 
+# Per-request model timeouts (milliseconds) so one stuck call can't use up the
+# whole 30 second response budget. A call that times out is retried once on
+# FALLBACK_MODEL with the same timeout, so even the retried OCR call (15 + 15)
+# stays within 30 seconds. The coordinator keeps the client default: its
+# routing call is short and the keyword fast path skips most of them.
+FORM_AGENT_TIMEOUT_MS = 10000
+OCR_AGENT_TIMEOUT_MS = 15000
+FALLBACK_MODEL = MODEL_GEMINI_2_5_FLASH_LITE
+
 # HTKK specific constants
 HTKK_FORM_TYPES = {
     "01/GTGT": "VAT Declaration",
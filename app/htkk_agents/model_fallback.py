@@ -0,0 +1,55 @@
+"""
+Timeout fallback for agent model calls.
+A model call that runs into its HTTP timeout is retried once on the fallback
+model instead of failing the whole turn; any other error is left to ADK.
+"""
+import logging
+from typing import Callable, Optional
+
+import httpx
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# asyncio.TimeoutError is an alias of TimeoutError and covers aiohttp timeouts
+_TIMEOUT_ERRORS = (TimeoutError, httpx.TimeoutException)
+
+
+def retry_on_timeout(fallback_model: str, timeout_ms: int) -> Callable:
+    """
+    Build an on_model_error_callback that retries a timed out request once.
+
+    Args:
+        fallback_model: Model name used for the retry
+        timeout_ms: HTTP timeout of the retry in milliseconds
+
+    Returns:
+        Callback for Agent(on_model_error_callback=...)
+    """
+    async def on_model_error(
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> Optional[LlmResponse]:
+        if not isinstance(error, _TIMEOUT_ERRORS):
+            return None
+
+        logger.warning(
+            "agent_timeout: %s model call timed out (%s), retrying once on %s",
+            callback_context.agent_name, type(error).__name__, fallback_model
+        )
+        config = (llm_request.config or types.GenerateContentConfig()).model_copy(
+            update={"http_options": types.HttpOptions(timeout=timeout_ms)}
+        )
+        retry_request = llm_request.model_copy(
+            update={"model": fallback_model, "config": config}
+        )
+        response = None
+        async for response in LLMRegistry.new_llm(fallback_model).generate_content_async(retry_request):
+            pass
+        return response
+
+    return on_model_error
@@ -0,0 +1,92 @@
+"""
+Keyword fast path for the root coordinator agent.
+Requests that clearly belong to one sub-agent are transferred without a coordinator
+LLM call; anything ambiguous or unmatched falls through to the model as before.
+"""
+import re
+import unicodedata
+from typing import Final, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+# Keyword sets mirror the REDIRECT RULES in ROOT_AGENT_INSTRUCTION; multi-word
+# keywords are matched against adjacent token pairs
+_AGENT_KEYWORDS: Final = {
+    "ocr_agent": frozenset({
+        "file", "tài liệu", "hóa đơn", "đọc", "ocr", "scan", "pdf", "xml", "hình ảnh",
+        "r2_file_url",
+    }),
+    "form_agent": frozenset({
+        "form", "template", "biểu mẫu", "tờ khai", "thuế", "tính toán",
+        "vat", "gtgt", "tndn", "tncn", "01/gtgt", "02/tncn", "03/tndn",
+        "parse", "render", "validate", "export", "xuất",
+    }),
+}
+
+# Compiled once at import; every routed message reuses the same pattern object
+_TOKEN_RE: Final = re.compile(r"[\w/]+")
+
+
+def _grams(text: str) -> set:
+    """Lowercased tokens of the text plus every adjacent token pair"""
+    # Vietnamese input may arrive decomposed; keywords are written precomposed
+    tokens = _TOKEN_RE.findall(unicodedata.normalize("NFC", text).lower())
+    grams = set(tokens)
+    grams.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return grams
+
+
+def _is_document(blob) -> bool:
+    """True for inline or file data the OCR agent should read; voice notes are not documents"""
+    if blob is None:
+        return False
+    return not (blob.mime_type or "").startswith("audio/")
+
+
+def classify(text: str, has_attachment: bool = False) -> Optional[str]:
+    """Return the sub-agent with the most keyword hits, or None when tied or unmatched"""
+    # Any image or document goes to the OCR agent, whatever the text asks for
+    if has_attachment:
+        return "ocr_agent"
+
+    grams = _grams(text)
+    hits = {name: len(keywords & grams) for name, keywords in _AGENT_KEYWORDS.items()}
+
+    ranked = sorted(hits.items(), key=lambda item: item[1], reverse=True)
+    best, runner_up = ranked[0], ranked[1]
+    if best[1] == 0 or best[1] == runner_up[1]:
+        return None
+    return best[0]
+
+
+def route_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Coordinator before_model_callback that answers with a direct transfer when possible"""
+    user_content = callback_context.user_content
+    # Only route the user's fresh message, never follow-up turns inside the invocation
+    if user_content is None or not llm_request.contents or llm_request.contents[-1] != user_content:
+        return None
+
+    parts = user_content.parts or []
+    text = " ".join(part.text for part in parts if part.text)
+    has_attachment = any(_is_document(part.inline_data or part.file_data) for part in parts)
+
+    agent_name = classify(text, has_attachment)
+    if agent_name is None:
+        return None
+
+    return LlmResponse(
+        content=types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name="transfer_to_agent", args={"agent_name": agent_name}
+                    )
+                )
+            ],
+        )
+    )
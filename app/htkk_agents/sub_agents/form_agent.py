@@ -4,24 +4,11 @@ Merged with tax validator functionality for comprehensive form processing.
 """
 
 from google.adk.agents import Agent
+from google.genai import types
 
-from ..constants import MODEL_GEMINI_2_5_FLASH_LITE
-from ..tools.form_tools import (
-    parse_htkk_template,
-    render_form_structure,
-    validate_form_data,
-    calculate_field_dependencies,
-    export_form_to_xml,
-    get_available_form_types
-)
-from ..tools.tax_tools import (
-    calculate_vat_tax,
-    calculate_corporate_tax,
-    calculate_personal_income_tax,
-    validate_tax_form_compliance,
-    get_current_tax_rates,
-    validate_business_rules
-)
+from ..constants import MODEL_GEMINI_2_5_FLASH_LITE, FALLBACK_MODEL, FORM_AGENT_TIMEOUT_MS
+from ..model_fallback import retry_on_timeout
+from .tool_registry import TOOLS
 from .form_prompts import FORM_AGENT_INSTRUCTION, FORM_AGENT_DESCRIPTION
 
 # Initialize the Form Agent (merged with tax validator functionality)
@@ -32,19 +19,24 @@ form_agent = Agent(
     instruction=FORM_AGENT_INSTRUCTION,
     tools=[
         # Form tools
-        parse_htkk_template,
-        render_form_structure,
-        validate_form_data,
-        calculate_field_dependencies,
-        export_form_to_xml,
-        get_available_form_types,
+        TOOLS["parse_htkk_template"],
+        TOOLS["render_form_structure"],
+        TOOLS["validate_form_data"],
+        TOOLS["calculate_field_dependencies"],
+        TOOLS["export_form_to_xml"],
+        TOOLS["get_available_form_types"],
         # Tax calculation tools (merged from tax_validator_agent)
-        calculate_vat_tax,
-        calculate_corporate_tax,
-        calculate_personal_income_tax,
-        validate_tax_form_compliance,
-        get_current_tax_rates,
-        validate_business_rules
+        TOOLS["calculate_vat_tax"],
+        TOOLS["calculate_corporate_tax"],
+        TOOLS["calculate_personal_income_tax"],
+        TOOLS["calculate_personal_income_tax_batch"],
+        TOOLS["validate_tax_form_compliance"],
+        TOOLS["get_current_tax_rates"],
+        TOOLS["validate_business_rules"]
     ],
+    generate_content_config=types.GenerateContentConfig(
+        http_options=types.HttpOptions(timeout=FORM_AGENT_TIMEOUT_MS)
+    ),
+    on_model_error_callback=retry_on_timeout(FALLBACK_MODEL, FORM_AGENT_TIMEOUT_MS),
     output_key="last_form_response"
 ) 
\ No newline at end of file
@@ -3,21 +3,11 @@ OCR agent for handling document processing and data extraction.
 """
 
 from google.adk.agents import Agent
+from google.genai import types
 
-from ..constants import MODEL_GEMINI_2_5_FLASH_LITE
-from ..tools.ocr_tools import (
-    process_pdf_document,
-    process_xml_document,
-    extract_text_from_pdf,
-    map_extracted_data_to_form,
-    process_invoice_batch,
-    get_cached_document_data,
-    process_r2_document,
-    analyze_document_structure
-)
-from ..tools.form_tools import (
-    export_form_to_xml,
-)
+from ..constants import MODEL_GEMINI_2_5_FLASH_LITE, FALLBACK_MODEL, OCR_AGENT_TIMEOUT_MS
+from ..model_fallback import retry_on_timeout
+from .tool_registry import TOOLS
 from .ocr_prompts import OCR_AGENT_INSTRUCTION, OCR_AGENT_DESCRIPTION
 
 # Initialize the OCR Agent
@@ -28,23 +18,27 @@ ocr_agent = Agent(
     instruction=OCR_AGENT_INSTRUCTION,
     tools=[
         # Document analysis and structure detection
-        analyze_document_structure,
+        TOOLS["analyze_document_structure"],
         
         # Document processing tools
-        process_pdf_document,
-        process_xml_document,
-        process_r2_document,
+        TOOLS["process_pdf_document"],
+        TOOLS["process_xml_document"],
+        TOOLS["process_r2_document"],
         
         # Text extraction and processing
-        extract_text_from_pdf,
+        TOOLS["extract_text_from_pdf"],
         
         # Data mapping and form generation
-        map_extracted_data_to_form,
-        export_form_to_xml,
+        TOOLS["map_extracted_data_to_form"],
+        TOOLS["export_form_to_xml"],
         
         # Batch processing and caching
-        process_invoice_batch,
-        get_cached_document_data,
+        TOOLS["process_invoice_batch"],
+        TOOLS["get_cached_document_data"],
     ],
+    generate_content_config=types.GenerateContentConfig(
+        http_options=types.HttpOptions(timeout=OCR_AGENT_TIMEOUT_MS)
+    ),
+    on_model_error_callback=retry_on_timeout(FALLBACK_MODEL, OCR_AGENT_TIMEOUT_MS),
     output_key="last_ocr_response"
 ) 
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Shared FunctionTool instances for the HTKK sub-agents.
+Tools are wrapped once at import so agents that list the same function reuse one
+tool object instead of each agent re-wrapping the raw callable.
+"""
+
+from google.adk.tools import FunctionTool
+
+from ..tools.form_tools import (
+    parse_htkk_template,
+    render_form_structure,
+    validate_form_data,
+    calculate_field_dependencies,
+    export_form_to_xml,
+    get_available_form_types
+)
+from ..tools.tax_tools import (
+    calculate_vat_tax,
+    calculate_corporate_tax,
+    calculate_personal_income_tax,
+    calculate_personal_income_tax_batch,
+    validate_tax_form_compliance,
+    get_current_tax_rates,
+    validate_business_rules
+)
+from ..tools.ocr_tools import (
+    process_pdf_document,
+    process_xml_document,
+    extract_text_from_pdf,
+    map_extracted_data_to_form,
+    process_invoice_batch,
+    get_cached_document_data,
+    process_r2_document,
+    analyze_document_structure
+)
+
+TOOLS = {
+    func.__name__: FunctionTool(func)
+    for func in (
+        parse_htkk_template,
+        render_form_structure,
+        validate_form_data,
+        calculate_field_dependencies,
+        export_form_to_xml,
+        get_available_form_types,
+        calculate_vat_tax,
+        calculate_corporate_tax,
+        calculate_personal_income_tax,
+        calculate_personal_income_tax_batch,
+        validate_tax_form_compliance,
+        get_current_tax_rates,
+        validate_business_rules,
+        process_pdf_document,
+        process_xml_document,
+        extract_text_from_pdf,
+        map_extracted_data_to_form,
+        process_invoice_batch,
+        get_cached_document_data,
+        process_r2_document,
+        analyze_document_structure,
+    )
+}
@@ -3,8 +3,42 @@ Form-related tools for HTKK AI agents.
 These tools handle XML template parsing, form rendering, and validation.
 """
 import json
+import logging
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
+from ..constants import HTKK_FORM_TYPES
+from .serialization import to_json, from_json
+
+logger = logging.getLogger(__name__)
+
+# Conditional import for lxml, falling back to the stdlib ElementTree
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>'
+
+# Static failure responses, serialized once at import
+_ERR_INVALID_JSON = to_json({
+    "success": False,
+    "error": "Invalid JSON format in form_data",
+    "message": "Please provide valid JSON data"
+})
+_ERR_UNSUPPORTED_FORM_DATA = to_json({
+    "success": False,
+    "error": "Unsupported form_data type",
+    "message": "form_data must be a JSON string or object"
+})
+
+# HTKK_FORM_TYPES is a constant table, so its tool response never changes
+_FORM_TYPES_RESPONSE = to_json({
+    "success": True,
+    "form_types": HTKK_FORM_TYPES,
+    "message": "Available form types retrieved successfully"
+})
+
 # Mock services for now - will be replaced with actual implementations
 class HTKKParser:
     def parse_form_template(self, form_type: str):
@@ -23,21 +57,29 @@ class FormEngine:
     def export_to_xml(self, data):
         # Minimal HTKK-like XML envelope so frontend preview/download makes sense
         try:
-            from datetime import datetime
-            import json as _json
-            serialized = _json.dumps(data, ensure_ascii=False)
+            serialized = to_json(data)
         except Exception:
             serialized = str(data)
-        return (
-            '<?xml version="1.0" encoding="UTF-8"?>'
-            '<HSoThueDTu>'
-            '  <HSoKhaiThue>'
-            '    <CTieuTKhaiChinh>'
-            f'      <NoiDung>{serialized}</NoiDung>'
-            '    </CTieuTKhaiChinh>'
-            '  </HSoKhaiThue>'
-            '</HSoThueDTu>'
-        )
+        # Build a real tree so the serializer escapes user-provided content
+        root = ET.Element("HSoThueDTu")
+        declaration = ET.SubElement(ET.SubElement(root, "HSoKhaiThue"), "CTieuTKhaiChinh")
+        ET.SubElement(declaration, "NoiDung").text = serialized
+        return _XML_DECLARATION + ET.tostring(root, encoding="unicode")
+
+
+# Shared instances reused by every tool call; both hold no per-request state,
+# so concurrent tool calls can use them safely
+_PARSER = HTKKParser()
+_ENGINE = FormEngine()
+
+
+def _cached_call(func, *args) -> str:
+    """Call an lru_cache'd response builder, bypassing the cache for unhashable args"""
+    try:
+        return func(*args)
+    except TypeError:
+        # e.g. the model passed form_data as an object instead of a JSON string
+        return func.__wrapped__(*args)
 
 
 def parse_htkk_template(form_type: str) -> str:
@@ -49,32 +91,37 @@ def parse_htkk_template(form_type: str) -> str:
     Returns:
         str: JSON string containing the parsed form structure
     """
-    print(f"--- Tool: parse_htkk_template called with form_type: {form_type} ---")
-    
+    logger.debug("--- Tool: parse_htkk_template called with form_type: %s ---", form_type)
+    return _cached_call(_parse_template_response, form_type)
+
+
+@lru_cache(maxsize=32)
+def _parse_template_response(form_type: str) -> str:
+    """Build the parse_htkk_template response; templates are static per form type"""
     try:
-        parser = HTKKParser()
+        parser = _PARSER
         template = parser.parse_form_template(form_type)
         
         if template:
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "form_type": form_type,
                 "template": template,
                 "message": f"Successfully parsed template for {form_type}"
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Failed to parse template for {form_type}",
                 "message": "Template not found or parsing failed"
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error parsing template for {form_type}"
-        }, ensure_ascii=False)
+        })
 
 
 def render_form_structure(form_type: str, form_data: str = "{}") -> str:
@@ -82,49 +129,53 @@ def render_form_structure(form_type: str, form_data: str = "{}") -> str:
     
     Args:
         form_type (str): The HTKK form type
-        form_data (str): JSON string of form data to populate (optional)
+        form_data (str): JSON string or object of form data to populate (optional)
         
     Returns:
         str: JSON string containing the rendered form structure
     """
-    print(f"--- Tool: render_form_structure called with form_type: {form_type} ---")
-    
+    logger.debug("--- Tool: render_form_structure called with form_type: %s ---", form_type)
+    return _cached_call(_render_form_response, form_type, form_data)
+
+
+@lru_cache(maxsize=256)
+def _render_form_response(form_type: str, form_data: str) -> str:
+    """Build the render_form_structure response for one (form_type, form_data) pair"""
     try:
-        parser = HTKKParser()
-        engine = FormEngine()
+        parser = _PARSER
+        engine = _ENGINE
         
         # Parse template
         template = parser.parse_form_template(form_type)
         if not template:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": f"Template not found for {form_type}"
-            }, ensure_ascii=False)
+            })
         
         # Render form structure
         form_structure = engine.render_form_structure(template)
         
-        # Apply form data if provided
+        # Apply form data if provided; from_json passes already-parsed dicts/lists through
         if form_data and form_data != "{}":
             try:
-                data = json.loads(form_data)
-                form_structure["data"] = data
+                form_structure["data"] = from_json(form_data)
             except json.JSONDecodeError:
                 pass
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "form_structure": form_structure,
             "message": f"Form structure rendered for {form_type}"
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error rendering form structure for {form_type}"
-        }, ensure_ascii=False)
+        })
 
 
 def validate_form_data(form_type: str, form_data) -> str:
@@ -137,37 +188,29 @@ def validate_form_data(form_type: str, form_data) -> str:
     Returns:
         str: JSON string containing validation results
     """
-    print(f"--- Tool: validate_form_data called with form_type: {form_type} ---")
+    logger.debug("--- Tool: validate_form_data called with form_type: %s ---", form_type)
     
     try:
-        engine = FormEngine()
+        engine = _ENGINE
 
         # Accept both JSON string and already-parsed dict/list
         if isinstance(form_data, (dict, list)):
             data = form_data
         elif isinstance(form_data, str):
             try:
-                data = json.loads(form_data)
+                data = from_json(form_data)
             except json.JSONDecodeError:
                 # Attempt to handle single-quoted or python-literal strings safely
                 try:
                     import ast
                     data = ast.literal_eval(form_data)
                     # Ensure it's JSON-serializable structure
-                    json.dumps(data, ensure_ascii=False)
+                    to_json(data)
                 except Exception:
-                    return json.dumps({
-                        "success": False,
-                        "error": "Invalid JSON format in form_data",
-                        "message": "Please provide valid JSON data"
-                    }, ensure_ascii=False)
+                    return _ERR_INVALID_JSON
         else:
             # Unsupported type
-            return json.dumps({
-                "success": False,
-                "error": "Unsupported form_data type",
-                "message": "form_data must be a JSON string or object"
-            }, ensure_ascii=False)
+            return _ERR_UNSUPPORTED_FORM_DATA
         
         # Validate form data
         validation_result = engine.validate_form_data({
@@ -175,25 +218,21 @@ def validate_form_data(form_type: str, form_data) -> str:
             "data": data
         })
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "validation_result": validation_result,
             "message": "Form validation completed"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
-            "success": False,
-            "error": "Invalid JSON format in form_data",
-            "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        return _ERR_INVALID_JSON
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error validating form data for {form_type}"
-        }, ensure_ascii=False)
+        })
 
 
 def calculate_field_dependencies(form_type: str, field_path: str, form_data: str) -> str:
@@ -207,11 +246,11 @@ def calculate_field_dependencies(form_type: str, field_path: str, form_data: str
     Returns:
         str: JSON string containing calculated dependencies
     """
-    print(f"--- Tool: calculate_field_dependencies called with field: {field_path} ---")
+    logger.debug("--- Tool: calculate_field_dependencies called with field: %s ---", field_path)
     
     try:
-        engine = FormEngine()
-        data = json.loads(form_data)
+        engine = _ENGINE
+        data = from_json(form_data)
         
         # Calculate dependencies
         dependency_result = engine.calculate_field_dependencies({
@@ -220,26 +259,22 @@ def calculate_field_dependencies(form_type: str, field_path: str, form_data: str
             "dependencies": data
         })
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "field_path": field_path,
             "calculated_dependencies": dependency_result,
             "message": f"Dependencies calculated for field {field_path}"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
-            "success": False,
-            "error": "Invalid JSON format in form_data",
-            "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        return _ERR_INVALID_JSON
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error calculating dependencies for {field_path}"
-        }, ensure_ascii=False)
+        })
 
 
 def export_form_to_xml(form_type: str, form_data: str) -> str:
@@ -252,11 +287,11 @@ def export_form_to_xml(form_type: str, form_data: str) -> str:
     Returns:
         str: JSON string containing the XML export result
     """
-    print(f"--- Tool: export_form_to_xml called with form_type: {form_type} ---")
+    logger.debug("--- Tool: export_form_to_xml called with form_type: %s ---", form_type)
     
     try:
-        engine = FormEngine()
-        data = json.loads(form_data)
+        engine = _ENGINE
+        data = from_json(form_data)
         
         # Export to XML
         xml_content = engine.export_to_xml({
@@ -264,25 +299,21 @@ def export_form_to_xml(form_type: str, form_data: str) -> str:
             "data": data
         })
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "xml_content": xml_content,
             "message": f"XML exported successfully for {form_type}"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
-            "success": False,
-            "error": "Invalid JSON format in form_data",
-            "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        return _ERR_INVALID_JSON
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error exporting XML for {form_type}"
-        }, ensure_ascii=False)
+        })
 
 
 def get_available_form_types() -> str:
@@ -291,20 +322,5 @@ def get_available_form_types() -> str:
     Returns:
         str: JSON string containing available form types
     """
-    print("--- Tool: get_available_form_types called ---")
-    
-    try:
-        from ..constants import HTKK_FORM_TYPES
-        
-        return json.dumps({
-            "success": True,
-            "form_types": HTKK_FORM_TYPES,
-            "message": "Available form types retrieved successfully"
-        }, ensure_ascii=False)
-        
-    except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": "Error retrieving form types"
-        }, ensure_ascii=False) 
\ No newline at end of file
+    logger.debug("--- Tool: get_available_form_types called ---")
+    return _FORM_TYPES_RESPONSE
@@ -3,9 +3,15 @@ OCR-related tools for HTKK AI agents.
 These tools handle PDF/XML document processing and data extraction with LLM integration.
 """
 import json
+import logging
 import base64
 import hashlib
-from typing import Dict, Any, List, Optional, Tuple
+import re
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from .serialization import to_json, from_json
+
+logger = logging.getLogger(__name__)
 
 # Conditional import for PyMuPDF
 try:
@@ -13,7 +19,70 @@ try:
     FITZ_AVAILABLE = True
 except ImportError:
     FITZ_AVAILABLE = False
-    print("Warning: PyMuPDF (fitz) not available. PDF processing will be limited.")
+    logger.warning("PyMuPDF (fitz) not available. PDF processing will be limited.")
+
+# Conditional import for lxml, falling back to the stdlib ElementTree
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+    # Comments/PIs are dropped; only structure is inspected, so whitespace text and
+    # the xml:id hash are skipped too. Internal entities are expanded like the
+    # stdlib parser does, while external entities and DTDs are never fetched.
+    _XML_PARSER = ET.XMLParser(
+        remove_comments=True,
+        remove_pis=True,
+        remove_blank_text=True,
+        collect_ids=False,
+        resolve_entities="internal",
+        load_dtd=False,
+        no_network=True,
+    )
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+    _XML_PARSER = None
+
+# Leading <?xml ...?> declaration, dropped before lxml parses already-decoded text
+_XML_DECL_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def _parse_xml(xml_text: str):
+    """Parse decoded XML text and return the root element.
+    
+    The text is already decoded, so a declared encoding must not be applied again
+    (lxml rejects str input that carries one).
+    """
+    if LXML_AVAILABLE:
+        return ET.fromstring(_XML_DECL_RE.sub("", xml_text, count=1), parser=_XML_PARSER)
+    return ET.fromstring(xml_text)
+
+
+def _child_elements(element):
+    """Iterate the element children only, skipping entity references lxml may keep"""
+    return (child for child in element if isinstance(child.tag, str))
+
+
+# Amount patterns for VAT field mapping, tried in order
+_AMOUNT_PATTERNS = (
+    re.compile(r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)"),
+    re.compile(r"(\d+(?:\.\d{2})?)"),
+)
+
+
+def _page_sections(pages: List[Dict]) -> Iterator[str]:
+    """Yield the pieces of the joined document text, one per page"""
+    for index, page in enumerate(pages):
+        separator = "\n\n" if index else ""
+        yield f"{separator}PAGE {page['page']}:\n{page['text']}"
+
+
+def _join_pages(pages: List[Dict]) -> str:
+    """Join extracted page texts into one document text with page headers"""
+    return "".join(_page_sections(pages))
+
+
+# Separator placed between pages inside one LLM chunk
+_PAGE_BREAK = "\n\n--- Page Break ---\n\n"
 
 # Enhanced OCR service with LLM integration
 class OCRService:
@@ -52,22 +121,17 @@ class OCRService:
             }
             
         try:
-            # Open PDF with PyMuPDF
-            pdf_doc = fitz.open(stream=file_content, filetype="pdf")
-            total_pages = len(pdf_doc)
-            
-            # Extract text from each page
-            page_texts = []
-            for page_num in range(total_pages):
-                page = pdf_doc[page_num]
-                text = page.get_text()
-                page_texts.append({
-                    "page": page_num + 1,
-                    "text": text,
-                    "length": len(text)
-                })
-            
-            pdf_doc.close()
+            # Open PDF with PyMuPDF and extract text page by page as it streams
+            with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
+                total_pages = len(pdf_doc)
+                page_texts = []
+                for page_num, page in enumerate(pdf_doc, 1):
+                    text = page.get_text()
+                    page_texts.append({
+                        "page": page_num,
+                        "text": text,
+                        "length": len(text)
+                    })
             
             # Create chunks for LLM processing
             chunks = self._create_intelligent_chunks(page_texts)
@@ -96,8 +160,6 @@ class OCRService:
     def _process_xml_with_llm(self, file_content):
         """Process XML with LLM-friendly structure"""
         try:
-            import xml.etree.ElementTree as ET
-            
             # Parse XML
             if isinstance(file_content, bytes):
                 xml_content = file_content.decode('utf-8')
@@ -105,7 +167,7 @@ class OCRService:
                 xml_content = str(file_content)
             
             # Basic XML parsing for structure
-            root = ET.fromstring(xml_content)
+            root = _parse_xml(xml_content)
             
             # Extract key elements for LLM processing
             xml_structure = self._extract_xml_structure(root)
@@ -129,27 +191,29 @@ class OCRService:
     def _create_intelligent_chunks(self, page_texts: List[Dict]) -> List[Dict]:
         """Create intelligent chunks for LLM processing"""
         chunks = []
-        current_chunk = {"text": "", "pages": [], "length": 0}
+        # Collect page sections and join once per chunk instead of growing a string
+        parts, pages, length = [], [], 0
         
         for page_info in page_texts:
             page_text = page_info["text"]
             page_num = page_info["page"]
             
             # If adding this page would exceed chunk size, start new chunk
-            if current_chunk["length"] + len(page_text) > self.page_chunk_size and current_chunk["text"]:
-                chunks.append(current_chunk)
-                current_chunk = {"text": "", "pages": [], "length": 0}
+            if length + len(page_text) > self.page_chunk_size and parts:
+                chunks.append({"text": _PAGE_BREAK.join(parts), "pages": pages, "length": length})
+                parts, pages, length = [], [], 0
             
             # Add page to current chunk
-            if current_chunk["text"]:
-                current_chunk["text"] += "\n\n--- Page Break ---\n\n"
-            current_chunk["text"] += f"PAGE {page_num}:\n{page_text}"
-            current_chunk["pages"].append(page_num)
-            current_chunk["length"] = len(current_chunk["text"])
+            section = f"PAGE {page_num}:\n{page_text}"
+            if parts:
+                length += len(_PAGE_BREAK)
+            parts.append(section)
+            pages.append(page_num)
+            length += len(section)
         
         # Add final chunk if it has content
-        if current_chunk["text"]:
-            chunks.append(current_chunk)
+        if parts:
+            chunks.append({"text": _PAGE_BREAK.join(parts), "pages": pages, "length": length})
         
         return chunks
     
@@ -158,48 +222,57 @@ class OCRService:
         if current_depth >= max_depth:
             return {"type": "element", "tag": element.tag, "depth": current_depth}
         
-        structure = {
+        next_depth = current_depth + 1
+        return {
             "type": "element",
             "tag": element.tag,
             "attributes": dict(element.attrib),
-            "children": []
+            "children": [
+                self._extract_xml_structure(child, max_depth, next_depth)
+                for child in _child_elements(element)
+            ]
         }
-        
-        for child in element:
-            child_structure = self._extract_xml_structure(child, max_depth, current_depth + 1)
-            structure["children"].append(child_structure)
-        
-        return structure
     
     def _generate_hash(self, content):
         """Generate hash for content"""
         return hashlib.md5(content).hexdigest()
     
-    def extract_text_from_pdf(self, file_content):
-        """Extract raw text from PDF with page information"""
+    def extract_text_from_pdf(self, file_content, include_raw_text: bool = False):
+        """Extract raw text from PDF with page information.
+        
+        The joined document text is only returned when include_raw_text is set;
+        its length and SHA-256 digest are always reported.
+        """
         if not FITZ_AVAILABLE:
             return {"error": "PyMuPDF not available for PDF text extraction"}
             
         try:
-            pdf_doc = fitz.open(stream=file_content, filetype="pdf")
             pages = []
+            with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
+                for page_num, page in enumerate(pdf_doc, 1):
+                    text = page.get_text()
+                    pages.append({
+                        "page": page_num,
+                        "text": text,
+                        "length": len(text)
+                    })
             
-            for page_num in range(len(pdf_doc)):
-                page = pdf_doc[page_num]
-                text = page.get_text()
-                pages.append({
-                    "page": page_num + 1,
-                    "text": text,
-                    "length": len(text)
-                })
-            
-            pdf_doc.close()
-            
-            return {
+            # Length and digest are taken page by page, without building the joined text
+            digest = hashlib.sha256()
+            total_text_length = 0
+            for section in _page_sections(pages):
+                digest.update(section.encode("utf-8"))
+                total_text_length += len(section)
+
+            result = {
                 "total_pages": len(pages),
                 "pages": pages,
-                "total_text": "\n\n".join([f"PAGE {p['page']}:\n{p['text']}" for p in pages])
+                "total_text_length": total_text_length,
+                "total_text_sha256": digest.hexdigest()
             }
+            if include_raw_text:
+                result["total_text"] = _join_pages(pages)
+            return result
             
         except Exception as e:
             return {"error": f"Text extraction failed: {str(e)}"}
@@ -220,7 +293,7 @@ def analyze_document_structure(file_content_base64: str, file_name: str = "docum
     Returns:
         str: JSON string containing document analysis and form recommendations
     """
-    print(f"--- Tool: analyze_document_structure called for file: {file_name} ---")
+    logger.debug("--- Tool: analyze_document_structure called for file: %s ---", file_name)
     
     try:
         file_content = base64.b64decode(file_content_base64)
@@ -230,31 +303,27 @@ def analyze_document_structure(file_content_base64: str, file_name: str = "docum
         
         if file_type == "pdf":
             if not FITZ_AVAILABLE:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": "PyMuPDF not available for PDF analysis",
                     "message": f"Cannot analyze PDF {file_name} - PyMuPDF dependency missing"
-                }, ensure_ascii=False)
+                })
                 
             # Analyze PDF structure
-            pdf_doc = fitz.open(stream=file_content, filetype="pdf")
-            total_pages = len(pdf_doc)
-            
-            # Sample first few pages for content analysis
-            sample_pages = min(3, total_pages)
-            sample_texts = []
-            
-            for i in range(sample_pages):
-                page = pdf_doc[i]
-                text = page.get_text()
-                sample_texts.append(text[:500])  # First 500 chars per page
-            
-            pdf_doc.close()
+            with fitz.open(stream=file_content, filetype="pdf") as pdf_doc:
+                total_pages = len(pdf_doc)
+                
+                # Sample first few pages for content analysis
+                sample_pages = min(3, total_pages)
+                sample_texts = [
+                    page.get_text()[:500]  # First 500 chars per page
+                    for page in pdf_doc.pages(0, sample_pages)
+                ]
             
             # Analyze content patterns to suggest form types
             form_suggestions = _analyze_content_patterns(sample_texts)
             
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "file_name": file_name,
                 "file_type": "pdf",
@@ -271,23 +340,21 @@ def analyze_document_structure(file_content_base64: str, file_name: str = "docum
                     "estimated_chunks": max(1, total_pages // 2)
                 },
                 "message": f"PDF analysis completed: {total_pages} pages, {len(form_suggestions)} form types suggested"
-            }, ensure_ascii=False)
+            })
             
         elif file_type == "xml":
             # Analyze XML structure
             try:
-                import xml.etree.ElementTree as ET
-                xml_content = file_content.decode('utf-8')
-                root = ET.fromstring(xml_content)
+                root = _parse_xml(file_content.decode('utf-8'))
                 
                 xml_analysis = {
                     "root_tag": root.tag,
-                    "total_elements": len(list(root.iter())),
+                    "total_elements": sum(1 for el in root.iter() if isinstance(el.tag, str)),
                     "depth": _get_xml_depth(root),
                     "suggested_forms": _analyze_xml_patterns(root)
                 }
                 
-                return json.dumps({
+                return to_json({
                     "success": True,
                     "file_name": file_name,
                     "file_type": "xml",
@@ -298,27 +365,27 @@ def analyze_document_structure(file_content_base64: str, file_name: str = "docum
                         "llm_processing": "single_chunk_structured"
                     },
                     "message": f"XML analysis completed: {xml_analysis['total_elements']} elements"
-                }, ensure_ascii=False)
+                })
                 
             except Exception as e:
-                return json.dumps({
+                return to_json({
                     "success": False,
                     "error": f"XML parsing failed: {str(e)}",
                     "message": f"Could not analyze XML structure for {file_name}"
-                }, ensure_ascii=False)
+                })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": "Unsupported file type",
                 "message": f"File type '{file_type}' not supported for analysis"
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error analyzing document structure: {file_name}"
-        }, ensure_ascii=False)
+        })
 
 
 def process_pdf_document(file_content_base64: str, file_name: str = "document.pdf") -> str:
@@ -331,7 +398,7 @@ def process_pdf_document(file_content_base64: str, file_name: str = "document.pd
     Returns:
         str: JSON string containing extracted data and processing metadata
     """
-    print(f"--- Tool: process_pdf_document called with file: {file_name} ---")
+    logger.debug("--- Tool: process_pdf_document called with file: %s ---", file_name)
     
     try:
         # Decode base64 content
@@ -341,7 +408,7 @@ def process_pdf_document(file_content_base64: str, file_name: str = "document.pd
         result = ocr_service.process_document(file_content, "pdf")
         
         if result and "error" not in result["extracted_data"]:
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "file_name": file_name,
                 "file_type": "pdf",
@@ -354,20 +421,20 @@ def process_pdf_document(file_content_base64: str, file_name: str = "document.pd
                     "Use map_extracted_data_to_form() to map data to specific forms",
                     "Consider using process_r2_document() for R2-stored files"
                 ]
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": result.get("extracted_data", {}).get("error", "Failed to process PDF document"),
                 "message": f"Could not extract data from {file_name}"
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error processing PDF document: {file_name}"
-        }, ensure_ascii=False)
+        })
 
 
 def process_xml_document(xml_content: str, file_name: str = "document.xml") -> str:
@@ -380,14 +447,14 @@ def process_xml_document(xml_content: str, file_name: str = "document.xml") -> s
     Returns:
         str: JSON string containing extracted data
     """
-    print(f"--- Tool: process_xml_document called with file: {file_name} ---")
+    logger.debug("--- Tool: process_xml_document called with file: %s ---", file_name)
     
     try:
         ocr_service = OCRService()
         result = ocr_service.process_document(xml_content.encode(), "xml")
         
         if result and "error" not in result["extracted_data"]:
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "file_name": file_name,
                 "file_type": "xml",
@@ -398,64 +465,66 @@ def process_xml_document(xml_content: str, file_name: str = "document.xml") -> s
                     "Use analyze_document_structure() to determine form types",
                     "Use map_extracted_data_to_form() to map data to specific forms"
                 ]
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": result.get("extracted_data", {}).get("error", "Failed to process XML document"),
                 "message": f"Could not extract data from {file_name}"
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error processing XML document: {file_name}"
-        }, ensure_ascii=False)
+        })
 
 
-def extract_text_from_pdf(file_content_base64: str) -> str:
+def extract_text_from_pdf(file_content_base64: str, include_raw_text: bool = False) -> str:
     """Extract raw text from PDF document with page information.
     
     Args:
         file_content_base64 (str): Base64 encoded PDF file content
+        include_raw_text (bool): Also return the whole document text joined
+            across pages; page texts are always returned
         
     Returns:
         str: JSON string containing extracted text and page structure
     """
-    print("--- Tool: extract_text_from_pdf called ---")
+    logger.debug("--- Tool: extract_text_from_pdf called ---")
     
     try:
         # Decode base64 content
         file_content = base64.b64decode(file_content_base64)
         
         ocr_service = OCRService()
-        extracted_data = ocr_service.extract_text_from_pdf(file_content)
+        extracted_data = ocr_service.extract_text_from_pdf(file_content, include_raw_text)
         
         if "error" not in extracted_data:
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "extracted_data": extracted_data,
                 "message": "Text extracted successfully from PDF",
                 "processing_info": {
                     "total_pages": extracted_data["total_pages"],
-                    "total_text_length": len(extracted_data["total_text"]),
+                    "total_text_length": extracted_data["total_text_length"],
                     "chunking_recommended": extracted_data["total_pages"] > 3
                 }
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": extracted_data["error"],
                 "message": "No text could be extracted"
-            }, ensure_ascii=False)
+            })
             
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": "Error extracting text from PDF"
-        }, ensure_ascii=False)
+        })
 
 
 def map_extracted_data_to_form(extracted_data: str, form_type: str) -> str:
@@ -468,15 +537,15 @@ def map_extracted_data_to_form(extracted_data: str, form_type: str) -> str:
     Returns:
         str: JSON string containing mapped form data
     """
-    print(f"--- Tool: map_extracted_data_to_form called for form: {form_type} ---")
+    logger.debug("--- Tool: map_extracted_data_to_form called for form: %s ---", form_type)
     
     try:
-        data = json.loads(extracted_data)
+        data = from_json(extracted_data)
         
         # Enhanced mapping logic with form type detection
         mapped_data = _enhanced_form_mapping(data, form_type)
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "original_data": data,
@@ -488,20 +557,20 @@ def map_extracted_data_to_form(extracted_data: str, form_type: str) -> str:
                 "Review mapped fields for accuracy",
                 "Consider using form validation tools"
             ]
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": "Invalid JSON format in extracted_data",
             "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        })
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error mapping data to {form_type} form"
-        }, ensure_ascii=False)
+        })
 
 
 def process_invoice_batch(invoices_data: str) -> str:
@@ -513,17 +582,17 @@ def process_invoice_batch(invoices_data: str) -> str:
     Returns:
         str: JSON string containing batch processing results
     """
-    print("--- Tool: process_invoice_batch called ---")
+    logger.debug("--- Tool: process_invoice_batch called ---")
     
     try:
-        invoices = json.loads(invoices_data)
+        invoices = from_json(invoices_data)
         
         if not isinstance(invoices, list):
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": "Invalid input format",
                 "message": "Expected array of invoice data"
-            }, ensure_ascii=False)
+            })
         
         ocr_service = OCRService()
         
@@ -570,7 +639,7 @@ def process_invoice_batch(invoices_data: str) -> str:
         successful = sum(1 for r in results if r["success"])
         failed = len(results) - successful
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "total_processed": len(results),
             "successful": successful,
@@ -584,20 +653,20 @@ def process_invoice_batch(invoices_data: str) -> str:
                 }
             },
             "message": f"Batch processing completed: {successful} successful, {failed} failed"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": "Invalid JSON format in invoices_data",
             "message": "Please provide valid JSON array"
-        }, ensure_ascii=False)
+        })
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": "Error processing invoice batch"
-        }, ensure_ascii=False)
+        })
 
 
 def get_cached_document_data(file_hash: str) -> str:
@@ -609,12 +678,12 @@ def get_cached_document_data(file_hash: str) -> str:
     Returns:
         str: JSON string containing cached data or error
     """
-    print(f"--- Tool: get_cached_document_data called with hash: {file_hash} ---")
+    logger.debug("--- Tool: get_cached_document_data called with hash: %s ---", file_hash)
     
     try:
         # This would typically query the database for cached results
         # For now, return a placeholder response
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": "Document not found in cache",
             "message": f"No cached data found for hash: {file_hash}",
@@ -626,13 +695,13 @@ def get_cached_document_data(file_hash: str) -> str:
                     "Consider using analyze_document_structure() for fresh analysis"
                 ]
             }
-        }, ensure_ascii=False)
+        })
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error retrieving cached data for hash: {file_hash}"
-        }, ensure_ascii=False)
+        })
 
 
 def process_r2_document(file_url: str, file_type: str = "pdf", file_name: str = "r2_document") -> str:
@@ -646,7 +715,7 @@ def process_r2_document(file_url: str, file_type: str = "pdf", file_name: str =
     Returns:
         str: JSON string with extracted_data and file_hash
     """
-    print(f"--- Tool: process_r2_document called with url: {file_url} type: {file_type} ---")
+    logger.debug("--- Tool: process_r2_document called with url: %s type: %s ---", file_url, file_type)
     try:
         import requests
         resp = requests.get(file_url, timeout=15)
@@ -657,7 +726,7 @@ def process_r2_document(file_url: str, file_type: str = "pdf", file_name: str =
         result = ocr_service.process_document(file_content, file_type.lower())
 
         if result and "error" not in result["extracted_data"]:
-            return json.dumps({
+            return to_json({
                 "success": True,
                 "file_name": file_name,
                 "file_type": file_type.lower(),
@@ -671,19 +740,19 @@ def process_r2_document(file_url: str, file_type: str = "pdf", file_name: str =
                     "Use analyze_document_structure() to determine form types",
                     "Use map_extracted_data_to_form() to map data to specific forms"
                 ]
-            }, ensure_ascii=False)
+            })
         else:
-            return json.dumps({
+            return to_json({
                 "success": False,
                 "error": result.get("extracted_data", {}).get("error", "Failed to process R2 document"),
                 "message": f"Could not extract data from {file_name}"
-            }, ensure_ascii=False)
+            })
     except Exception as e:
-        return json.dumps({
+        return to_json({
             "success": False,
             "error": str(e),
             "message": f"Error processing R2 document: {file_name}"
-        }, ensure_ascii=False)
+        })
 
 
 # Helper functions for enhanced functionality
@@ -730,18 +799,27 @@ def _analyze_content_patterns(texts: List[str]) -> List[Dict]:
     return sorted(unique_suggestions, key=lambda x: x["confidence"], reverse=True)
 
 
+def _compile_tag_probe(tags: Tuple[str, ...]):
+    """Build a callable testing whether any of the tags occurs in a tree"""
+    if LXML_AVAILABLE:
+        xpath = ET.XPath(
+            "boolean(" + " | ".join(f"descendant-or-self::{tag}" for tag in tags) + ")"
+        )
+        return lambda root: bool(xpath(root))
+    return lambda root: any(next(root.iter(tag), None) is not None for tag in tags)
+
+
+# Tag probes compiled once and reused for every analyzed XML document
+_HAS_INVOICE_TAGS = _compile_tag_probe(("invoice", "hoaDon"))
+_HAS_INCOME_TAGS = _compile_tag_probe(("income", "thuNhap"))
+
+
 def _analyze_xml_patterns(root) -> List[Dict]:
     """Analyze XML structure to suggest form types"""
     suggestions = []
     
-    # Analyze XML tags and structure
-    tag_counts = {}
-    for elem in root.iter():
-        tag = elem.tag
-        tag_counts[tag] = tag_counts.get(tag, 0) + 1
-    
     # Pattern matching based on XML structure
-    if "invoice" in tag_counts or "hoaDon" in tag_counts:
+    if _HAS_INVOICE_TAGS(root):
         suggestions.append({
             "form_type": "01/GTGT",
             "confidence": "high",
@@ -749,7 +827,7 @@ def _analyze_xml_patterns(root) -> List[Dict]:
             "fields": ["invoice_number", "total_amount", "vat_amount"]
         })
     
-    if "income" in tag_counts or "thuNhap" in tag_counts:
+    if _HAS_INCOME_TAGS(root):
         suggestions.append({
             "form_type": "02/TNCN",
             "confidence": "medium", 
@@ -762,9 +840,10 @@ def _analyze_xml_patterns(root) -> List[Dict]:
 
 def _get_xml_depth(element, current_depth=0):
     """Calculate XML depth"""
-    if not list(element):
-        return current_depth
-    return max(_get_xml_depth(child, current_depth + 1) for child in element)
+    return max(
+        (_get_xml_depth(child, current_depth + 1) for child in _child_elements(element)),
+        default=current_depth
+    )
 
 
 def _enhanced_form_mapping(data: Dict, form_type: str) -> Dict:
@@ -776,6 +855,13 @@ def _enhanced_form_mapping(data: Dict, form_type: str) -> Dict:
         "mapping_confidence": "medium"
     }
     
+    # Pick the form-specific mapper first; unsupported forms skip text assembly
+    field_mapper = next(
+        (mapper for code, mapper in _FORM_FIELD_MAPPERS if code in form_type), None
+    )
+    if field_mapper is None:
+        return mapped_data
+    
     # Extract text content for analysis
     text_content = ""
     if "extracted_data" in data:
@@ -784,17 +870,12 @@ def _enhanced_form_mapping(data: Dict, form_type: str) -> Dict:
             text_content = " ".join([chunk["text"] for chunk in extracted["page_chunks"]])
         elif "total_text" in extracted:
             text_content = extracted["total_text"]
+        elif "pages" in extracted:
+            text_content = _join_pages(extracted["pages"])
         elif "content_preview" in extracted:
             text_content = extracted["content_preview"]
     
-    # Form-specific mapping logic
-    if "01/GTGT" in form_type:
-        mapped_data["mapped_fields"] = _map_vat_form_fields(text_content)
-    elif "02/TNCN" in form_type:
-        mapped_data["mapped_fields"] = _map_income_form_fields(text_content)
-    elif "03/TNDN" in form_type:
-        mapped_data["mapped_fields"] = _map_corporate_form_fields(text_content)
-    
+    mapped_data["mapped_fields"] = field_mapper(text_content)
     return mapped_data
 
 
@@ -807,17 +888,11 @@ def _map_vat_form_fields(text: str) -> Dict:
     if "hóa đơn" in text_lower or "invoice" in text_lower:
         fields["document_type"] = "invoice"
     
-    # Extract amounts (simplified)
-    import re
-    amount_patterns = [
-        r"(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)",
-        r"(\d+(?:\.\d{2})?)"
-    ]
-    
-    for pattern in amount_patterns:
-        matches = re.findall(pattern, text)
-        if matches:
-            fields["total_amount"] = matches[0]
+    # Extract amounts (simplified); only the first match is used, so stop there
+    for pattern in _AMOUNT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            fields["total_amount"] = match.group(1)
             break
     
     return fields
@@ -845,6 +920,14 @@ def _map_corporate_form_fields(text: str) -> Dict:
     return fields
 
 
+# Form code to field mapper, checked in order against the requested form type
+_FORM_FIELD_MAPPERS = (
+    ("01/GTGT", _map_vat_form_fields),
+    ("02/TNCN", _map_income_form_fields),
+    ("03/TNDN", _map_corporate_form_fields),
+)
+
+
 def _assess_mapping_quality(mapped_data: Dict) -> str:
     """Assess the quality of mapped data"""
     if not mapped_data.get("mapped_fields"):
@@ -0,0 +1,44 @@
+"""
+JSON helpers shared by the HTKK tool modules.
+Uses orjson when installed and falls back to the stdlib json module otherwise.
+"""
+import json
+from typing import Any
+
+# Conditional import for orjson
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def to_json(obj: Any) -> str:
+    """Serialize a tool response to a JSON string, keeping non-ASCII text as-is.
+    
+    With orjson, NaN and infinities serialize as null; stdlib json would emit the
+    non-standard NaN/Infinity tokens instead.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson rejects a few inputs json accepts (e.g. ints beyond 64 bits)
+            pass
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def from_json(data: Any) -> Any:
+    """Parse a JSON string; decode errors subclass json.JSONDecodeError either way.
+    
+    Tool arguments often arrive already parsed, so dicts and lists are returned
+    as-is. Other non-text input raises TypeError like json.loads, rather than the
+    JSONDecodeError orjson would report for it.
+    """
+    if isinstance(data, (dict, list)):
+        return data
+    if not isinstance(data, (str, bytes, bytearray)):
+        raise TypeError(f"the JSON object must be str, bytes or bytearray, not {type(data).__name__}")
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -3,8 +3,15 @@ Tax validation and calculation tools for HTKK AI agents.
 These tools handle tax calculations, business rule validation, and compliance checking.
 """
 import json
-from typing import Dict, Any, List, Optional
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable
 from ..constants import TAX_RATES
+from .serialization import to_json, from_json
+
+logger = logging.getLogger(__name__)
 
 # Mock FormEngine for now - will be replaced with actual implementation
 class FormEngine:
@@ -12,6 +19,83 @@ class FormEngine:
         return {"valid": True, "errors": []}
 
 
+# Progressive personal income tax brackets as (threshold, rate) pairs
+_PERSONAL_BRACKETS = tuple(zip(TAX_RATES["personal"]["thresholds"], TAX_RATES["personal"]["rates"]))
+_PERSONAL_TOP_RATE = TAX_RATES["personal"]["rates"][-1]
+
+# Corporate rates by business type; unknown types fall back to the standard rate
+_CORP_RATES = TAX_RATES["corporate"]
+_CORP_STD = _CORP_RATES["standard"]
+
+# Compliance thresholds in VND
+_ONE_BILLION = 1_000_000_000
+_HUNDRED_MILLION = 100_000_000
+_VAT_TOLERANCE = 1000  # Allowed gap between declared and expected VAT
+
+# Static failure responses, serialized once at import
+_ERR_INVALID_FORM_DATA = to_json({
+    "success": False,
+    "error": "Invalid JSON format in form_data",
+    "message": "Please provide valid JSON data"
+})
+_ERR_INVALID_JSON = to_json({
+    "success": False,
+    "error": "Invalid JSON format",
+    "message": "Please provide valid JSON data"
+})
+
+
+def _err(message: str, error: Exception) -> str:
+    """Serialize the failure response shared by every tool's exception handler"""
+    return to_json({
+        "success": False,
+        "error": str(error),
+        "message": message
+    })
+
+# Shared memoization pool for the validation tools. Results are pure functions
+# of the string arguments, so one bounded LRU keyed by (validator, *args)
+# serves both compliance and business-rule checks.
+_VALIDATION_CACHE_SIZE = 4096
+_validation_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_validation_cache_lock = threading.Lock()
+
+
+def _memoized_validation(key: tuple, compute: Callable[[], str]) -> str:
+    """Return the cached result for key, computing and storing it on a miss"""
+    try:
+        hash(key)
+    except TypeError:
+        # Non-string payloads (e.g. dicts passed by the model) are not cacheable
+        return compute()
+
+    with _validation_cache_lock:
+        cached = _validation_cache.get(key)
+        if cached is not None:
+            _validation_cache.move_to_end(key)
+            return cached
+
+    result = compute()
+
+    with _validation_cache_lock:
+        _validation_cache[key] = result
+        if len(_validation_cache) > _VALIDATION_CACHE_SIZE:
+            _validation_cache.popitem(last=False)
+    return result
+
+
+@lru_cache(maxsize=64)
+def _parse_form_data(form_data: str) -> Any:
+    """Parse a form_data string once; the result is shared and must not be mutated"""
+    return from_json(form_data)
+
+
+def _load_form_data(form_data: Any) -> Any:
+    """Parse form_data, reusing the parse when compliance and rule checks see the same string"""
+    if isinstance(form_data, str):
+        return _parse_form_data(form_data)
+    return from_json(form_data)
+
 def calculate_vat_tax(revenue: float, vat_rate: float = 10.0) -> str:
     """Calculate VAT tax amount.
     
@@ -22,13 +106,13 @@ def calculate_vat_tax(revenue: float, vat_rate: float = 10.0) -> str:
     Returns:
         str: JSON string containing VAT calculation results
     """
-    print(f"--- Tool: calculate_vat_tax called with revenue: {revenue}, rate: {vat_rate}% ---")
+    logger.debug("--- Tool: calculate_vat_tax called with revenue: %s, rate: %s%% ---", revenue, vat_rate)
     
     try:
         vat_amount = revenue * vat_rate / 100
         net_amount = revenue - vat_amount
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "calculation_type": "vat",
             "revenue": revenue,
@@ -36,14 +120,10 @@ def calculate_vat_tax(revenue: float, vat_rate: float = 10.0) -> str:
             "vat_amount": vat_amount,
             "net_amount": net_amount,
             "message": f"VAT calculated: {vat_amount:,.0f} VND ({vat_rate}% of {revenue:,.0f} VND)"
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": "Error calculating VAT tax"
-        }, ensure_ascii=False)
+        return _err("Error calculating VAT tax", e)
 
 
 def calculate_corporate_tax(taxable_profit: float, business_type: str = "standard") -> str:
@@ -56,17 +136,16 @@ def calculate_corporate_tax(taxable_profit: float, business_type: str = "standar
     Returns:
         str: JSON string containing corporate tax calculation results
     """
-    print(f"--- Tool: calculate_corporate_tax called with profit: {taxable_profit}, type: {business_type} ---")
+    logger.debug("--- Tool: calculate_corporate_tax called with profit: %s, type: %s ---", taxable_profit, business_type)
     
     try:
         # Get tax rate based on business type
-        corporate_rates = TAX_RATES["corporate"]
-        tax_rate = corporate_rates.get(business_type, corporate_rates["standard"])
+        tax_rate = _CORP_RATES.get(business_type, _CORP_STD)
         
         tax_amount = taxable_profit * tax_rate / 100
         net_profit = taxable_profit - tax_amount
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "calculation_type": "corporate",
             "taxable_profit": taxable_profit,
@@ -75,14 +154,10 @@ def calculate_corporate_tax(taxable_profit: float, business_type: str = "standar
             "tax_amount": tax_amount,
             "net_profit": net_profit,
             "message": f"Corporate tax calculated: {tax_amount:,.0f} VND ({tax_rate}% of {taxable_profit:,.0f} VND)"
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": "Error calculating corporate tax"
-        }, ensure_ascii=False)
+        return _err("Error calculating corporate tax", e)
 
 
 def calculate_personal_income_tax(annual_income: float) -> str:
@@ -94,50 +169,14 @@ def calculate_personal_income_tax(annual_income: float) -> str:
     Returns:
         str: JSON string containing personal income tax calculation results
     """
-    print(f"--- Tool: calculate_personal_income_tax called with income: {annual_income} ---")
+    logger.debug("--- Tool: calculate_personal_income_tax called with income: %s ---", annual_income)
     
     try:
-        personal_tax = TAX_RATES["personal"]
-        rates = personal_tax["rates"]
-        thresholds = personal_tax["thresholds"]
-        
-        total_tax = 0
-        remaining_income = annual_income
-        tax_breakdown = []
-        
-        for i, threshold in enumerate(thresholds):
-            if remaining_income <= 0:
-                break
-                
-            taxable_at_rate = min(remaining_income, threshold)
-            tax_at_rate = taxable_at_rate * rates[i] / 100
-            total_tax += tax_at_rate
-            
-            tax_breakdown.append({
-                "rate": rates[i],
-                "threshold": threshold,
-                "taxable_amount": taxable_at_rate,
-                "tax_amount": tax_at_rate
-            })
-            
-            remaining_income -= threshold
-        
-        # Handle income above highest threshold
-        if remaining_income > 0:
-            highest_rate = rates[-1]
-            tax_at_highest = remaining_income * highest_rate / 100
-            total_tax += tax_at_highest
-            
-            tax_breakdown.append({
-                "rate": highest_rate,
-                "threshold": "above_highest",
-                "taxable_amount": remaining_income,
-                "tax_amount": tax_at_highest
-            })
+        total_tax, tax_breakdown = _personal_income_tax(annual_income)
         
         net_income = annual_income - total_tax
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "calculation_type": "personal_income",
             "annual_income": annual_income,
@@ -145,14 +184,88 @@ def calculate_personal_income_tax(annual_income: float) -> str:
             "net_income": net_income,
             "tax_breakdown": tax_breakdown,
             "message": f"Personal income tax calculated: {total_tax:,.0f} VND from {annual_income:,.0f} VND"
-        }, ensure_ascii=False)
+        })
         
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": "Error calculating personal income tax"
-        }, ensure_ascii=False)
+        return _err("Error calculating personal income tax", e)
+
+
+def _personal_income_tax(annual_income: float) -> tuple:
+    """Walk the progressive brackets and return (total_tax, tax_breakdown)"""
+    total_tax = 0
+    remaining_income = annual_income
+    tax_breakdown = []
+    
+    for threshold, rate in _PERSONAL_BRACKETS:
+        if remaining_income <= 0:
+            break
+            
+        taxable_at_rate = min(remaining_income, threshold)
+        tax_at_rate = taxable_at_rate * rate / 100
+        total_tax += tax_at_rate
+        
+        tax_breakdown.append({
+            "rate": rate,
+            "threshold": threshold,
+            "taxable_amount": taxable_at_rate,
+            "tax_amount": tax_at_rate
+        })
+        
+        remaining_income -= threshold
+    
+    # Handle income above highest threshold
+    if remaining_income > 0:
+        highest_rate = _PERSONAL_TOP_RATE
+        tax_at_highest = remaining_income * highest_rate / 100
+        total_tax += tax_at_highest
+        
+        tax_breakdown.append({
+            "rate": highest_rate,
+            "threshold": "above_highest",
+            "taxable_amount": remaining_income,
+            "tax_amount": tax_at_highest
+        })
+    
+    return total_tax, tax_breakdown
+
+
+def calculate_personal_income_tax_batch(incomes: str) -> str:
+    """Calculate personal income tax for many annual incomes in one call.
+    
+    Args:
+        incomes (str): JSON array of annual income amounts
+        
+    Returns:
+        str: JSON string containing per-income tax totals and their sum
+    """
+    logger.debug("--- Tool: calculate_personal_income_tax_batch called ---")
+    
+    try:
+        amounts = from_json(incomes)
+        if not isinstance(amounts, list):
+            raise ValueError("incomes must be a JSON array of numbers")
+        
+        results = []
+        for annual_income in amounts:
+            total_tax, tax_breakdown = _personal_income_tax(annual_income)
+            results.append({
+                "annual_income": annual_income,
+                "total_tax": total_tax,
+                "net_income": annual_income - total_tax,
+                "bracket_taxes": [bracket["tax_amount"] for bracket in tax_breakdown]
+            })
+        
+        return to_json({
+            "success": True,
+            "calculation_type": "personal_income_batch",
+            "count": len(results),
+            "results": results,
+            "total_tax_sum": sum(result["total_tax"] for result in results),
+            "message": f"Personal income tax calculated for {len(results)} incomes"
+        })
+        
+    except Exception as e:
+        return _err("Error calculating personal income tax batch", e)
 
 
 def validate_tax_form_compliance(form_type: str, form_data: str) -> str:
@@ -165,10 +278,18 @@ def validate_tax_form_compliance(form_type: str, form_data: str) -> str:
     Returns:
         str: JSON string containing compliance validation results
     """
-    print(f"--- Tool: validate_tax_form_compliance called for form: {form_type} ---")
+    logger.debug("--- Tool: validate_tax_form_compliance called for form: %s ---", form_type)
     
+    return _memoized_validation(
+        ("compliance", form_type, form_data),
+        lambda: _check_compliance(form_type, form_data)
+    )
+
+
+def _check_compliance(form_type: str, form_data: str) -> str:
+    """Run compliance checks for validate_tax_form_compliance"""
     try:
-        data = json.loads(form_data)
+        data = _load_form_data(form_data)
         
         compliance_issues = []
         warnings = []
@@ -181,36 +302,13 @@ def validate_tax_form_compliance(form_type: str, form_data: str) -> str:
             compliance_issues.append("Company name or taxpayer name is required")
         
         # Form-specific validations
-        if form_type == "01/GTGT":  # VAT form
-            revenue = data.get("total_revenue", 0)
-            if revenue > 1000000000:  # 1 billion VND threshold
-                if not data.get("vat_registration"):
-                    compliance_issues.append("VAT registration required for revenue over 1 billion VND")
-            
-            vat_amount = data.get("vat_amount", 0)
-            vat_rate = data.get("vat_rate", 10)
-            expected_vat = revenue * vat_rate / 100
-            if abs(vat_amount - expected_vat) > 1000:
-                warnings.append(f"VAT amount mismatch: expected {expected_vat:,.0f}, got {vat_amount:,.0f}")
-        
-        elif form_type == "03/TNDN":  # Corporate tax
-            profit = data.get("taxable_profit", 0)
-            if profit < 0:
-                warnings.append("Negative taxable profit requires additional documentation")
-            
-            tax_amount = data.get("tax_amount", 0)
-            if profit > 0 and tax_amount == 0:
-                warnings.append("Positive profit but zero tax amount - please verify")
-        
-        elif form_type == "02/TNCN":  # Personal income tax
-            income = data.get("total_income", 0)
-            if income > 100000000:  # 100 million VND
-                if not data.get("tax_declaration_submitted"):
-                    compliance_issues.append("Tax declaration required for high income earners")
+        form_check = _FORM_CHECKS.get(form_type)
+        if form_check is not None:
+            form_check(data, compliance_issues, warnings)
         
         compliance_status = "compliant" if not compliance_issues else "non_compliant"
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "compliance_status": compliance_status,
@@ -219,20 +317,53 @@ def validate_tax_form_compliance(form_type: str, form_data: str) -> str:
             "issue_count": len(compliance_issues),
             "warning_count": len(warnings),
             "message": f"Compliance check completed for {form_type}: {compliance_status}"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
-            "success": False,
-            "error": "Invalid JSON format in form_data",
-            "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        return _ERR_INVALID_FORM_DATA
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": f"Error validating compliance for {form_type}"
-        }, ensure_ascii=False)
+        return _err(f"Error validating compliance for {form_type}", e)
+
+
+def _check_vat_form(data: Dict, compliance_issues: List[str], warnings: List[str]) -> None:
+    """Compliance checks specific to the 01/GTGT VAT form"""
+    revenue = data.get("total_revenue", 0)
+    if revenue > _ONE_BILLION:  # 1 billion VND threshold
+        if not data.get("vat_registration"):
+            compliance_issues.append("VAT registration required for revenue over 1 billion VND")
+    
+    vat_amount = data.get("vat_amount", 0)
+    vat_rate = data.get("vat_rate", 10)
+    expected_vat = revenue * vat_rate / 100
+    if abs(vat_amount - expected_vat) > _VAT_TOLERANCE:
+        warnings.append(f"VAT amount mismatch: expected {expected_vat:,.0f}, got {vat_amount:,.0f}")
+
+
+def _check_corporate_form(data: Dict, compliance_issues: List[str], warnings: List[str]) -> None:
+    """Compliance checks specific to the 03/TNDN corporate tax form"""
+    profit = data.get("taxable_profit", 0)
+    if profit < 0:
+        warnings.append("Negative taxable profit requires additional documentation")
+    
+    tax_amount = data.get("tax_amount", 0)
+    if profit > 0 and tax_amount == 0:
+        warnings.append("Positive profit but zero tax amount - please verify")
+
+
+def _check_personal_form(data: Dict, compliance_issues: List[str], warnings: List[str]) -> None:
+    """Compliance checks specific to the 02/TNCN personal income tax form"""
+    income = data.get("total_income", 0)
+    if income > _HUNDRED_MILLION:  # 100 million VND
+        if not data.get("tax_declaration_submitted"):
+            compliance_issues.append("Tax declaration required for high income earners")
+
+
+# Form-specific compliance checks keyed by form type; other forms only get the common checks
+_FORM_CHECKS = {
+    "01/GTGT": _check_vat_form,
+    "03/TNDN": _check_corporate_form,
+    "02/TNCN": _check_personal_form,
+}
 
 
 def get_current_tax_rates(tax_type: str = "all") -> str:
@@ -244,36 +375,40 @@ def get_current_tax_rates(tax_type: str = "all") -> str:
     Returns:
         str: JSON string containing tax rates
     """
-    print(f"--- Tool: get_current_tax_rates called for type: {tax_type} ---")
+    logger.debug("--- Tool: get_current_tax_rates called for type: %s ---", tax_type)
     
     try:
-        if tax_type == "all":
-            return json.dumps({
-                "success": True,
-                "tax_rates": TAX_RATES,
-                "message": "All current tax rates retrieved"
-            }, ensure_ascii=False)
-        elif tax_type in TAX_RATES:
-            return json.dumps({
-                "success": True,
-                "tax_type": tax_type,
-                "tax_rates": TAX_RATES[tax_type],
-                "message": f"Current {tax_type} tax rates retrieved"
-            }, ensure_ascii=False)
-        else:
-            return json.dumps({
-                "success": False,
-                "error": f"Unknown tax type: {tax_type}",
-                "available_types": list(TAX_RATES.keys()),
-                "message": "Please specify a valid tax type"
-            }, ensure_ascii=False)
-            
+        return _tax_rates_response(tax_type)
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": "Error retrieving tax rates"
-        }, ensure_ascii=False)
+        return _err("Error retrieving tax rates", e)
+
+
+@lru_cache(maxsize=16)
+def _tax_rates_response(tax_type: str) -> str:
+    """Build the get_current_tax_rates response for one tax type.
+    
+    Responses are cached on the assumption that TAX_RATES does not change at
+    runtime.
+    """
+    if tax_type == "all":
+        return to_json({
+            "success": True,
+            "tax_rates": TAX_RATES,
+            "message": "All current tax rates retrieved"
+        })
+    elif tax_type in TAX_RATES:
+        return to_json({
+            "success": True,
+            "tax_type": tax_type,
+            "tax_rates": TAX_RATES[tax_type],
+            "message": f"Current {tax_type} tax rates retrieved"
+        })
+    return to_json({
+        "success": False,
+        "error": f"Unknown tax type: {tax_type}",
+        "available_types": list(TAX_RATES.keys()),
+        "message": "Please specify a valid tax type"
+    })
 
 
 def validate_business_rules(form_type: str, form_data: str, rules: str = "[]") -> str:
@@ -287,25 +422,23 @@ def validate_business_rules(form_type: str, form_data: str, rules: str = "[]") -
     Returns:
         str: JSON string containing business rule validation results
     """
-    print(f"--- Tool: validate_business_rules called for form: {form_type} ---")
+    logger.debug("--- Tool: validate_business_rules called for form: %s ---", form_type)
     
+    return _memoized_validation(
+        ("business_rules", form_type, form_data, rules),
+        lambda: _check_business_rules(form_type, form_data, rules)
+    )
+
+
+def _check_business_rules(form_type: str, form_data: str, rules: str) -> str:
+    """Evaluate business rules for validate_business_rules"""
     try:
-        data = json.loads(form_data)
-        rule_list = json.loads(rules) if rules != "[]" else []
+        data = _load_form_data(form_data)
+        rule_list = from_json(rules) if rules != "[]" else []
         
         # Default rules for each form type
         if not rule_list:
-            if form_type == "01/GTGT":
-                rule_list = [
-                    {"id": "vat_001", "type": "required_field", "field": "tax_code"},
-                    {"id": "vat_002", "type": "required_field", "field": "company_name"},
-                    {"id": "vat_003", "type": "min_value", "field": "total_revenue", "value": 0}
-                ]
-            elif form_type == "03/TNDN":
-                rule_list = [
-                    {"id": "corp_001", "type": "required_field", "field": "tax_code"},
-                    {"id": "corp_002", "type": "required_field", "field": "company_name"}
-                ]
+            rule_list = _DEFAULT_RULES.get(form_type, [])
         
         rule_results = []
         
@@ -313,45 +446,25 @@ def validate_business_rules(form_type: str, form_data: str, rules: str = "[]") -
             rule_id = rule.get("id", "unknown")
             rule_type = rule.get("type", "validation")
             
-            passed = True
-            message = "Rule passed"
-            
-            try:
-                if rule_type == "required_field":
-                    field = rule.get("field")
-                    if not data.get(field):
-                        passed = False
-                        message = f"Required field '{field}' is missing"
-                
-                elif rule_type == "min_value":
-                    field = rule.get("field")
-                    min_value = rule.get("value", 0)
-                    if data.get(field, 0) < min_value:
-                        passed = False
-                        message = f"Field '{field}' must be at least {min_value}"
-                
-                elif rule_type == "max_value":
-                    field = rule.get("field")
-                    max_value = rule.get("value", float('inf'))
-                    if data.get(field, 0) > max_value:
-                        passed = False
-                        message = f"Field '{field}' must not exceed {max_value}"
-            
-            except Exception as e:
-                passed = False
-                message = f"Error validating rule: {str(e)}"
+            message = None
+            rule_check = _RULE_CHECKS.get(rule_type)
+            if rule_check is not None:
+                try:
+                    message = rule_check(rule, data)
+                except Exception as e:
+                    message = f"Error validating rule: {str(e)}"
             
             rule_results.append({
                 "rule_id": rule_id,
                 "rule_type": rule_type,
-                "passed": passed,
-                "message": message
+                "passed": message is None,
+                "message": message or "Rule passed"
             })
         
         passed_rules = sum(1 for result in rule_results if result["passed"])
         total_rules = len(rule_results)
         
-        return json.dumps({
+        return to_json({
             "success": True,
             "form_type": form_type,
             "rule_results": rule_results,
@@ -359,17 +472,57 @@ def validate_business_rules(form_type: str, form_data: str, rules: str = "[]") -
             "total_rules": total_rules,
             "all_rules_passed": passed_rules == total_rules,
             "message": f"Business rule validation completed: {passed_rules}/{total_rules} rules passed"
-        }, ensure_ascii=False)
+        })
         
     except json.JSONDecodeError:
-        return json.dumps({
-            "success": False,
-            "error": "Invalid JSON format",
-            "message": "Please provide valid JSON data"
-        }, ensure_ascii=False)
+        return _ERR_INVALID_JSON
     except Exception as e:
-        return json.dumps({
-            "success": False,
-            "error": str(e),
-            "message": f"Error validating business rules for {form_type}"
-        }, ensure_ascii=False) 
\ No newline at end of file
+        return _err(f"Error validating business rules for {form_type}", e)
+
+
+def _check_required_field(rule: Dict, data: Dict) -> Optional[str]:
+    """Fail when the rule's field is missing or empty"""
+    field = rule.get("field")
+    if not data.get(field):
+        return f"Required field '{field}' is missing"
+    return None
+
+
+def _check_min_value(rule: Dict, data: Dict) -> Optional[str]:
+    """Fail when the rule's field is below the rule value"""
+    field = rule.get("field")
+    min_value = rule.get("value", 0)
+    if data.get(field, 0) < min_value:
+        return f"Field '{field}' must be at least {min_value}"
+    return None
+
+
+def _check_max_value(rule: Dict, data: Dict) -> Optional[str]:
+    """Fail when the rule's field exceeds the rule value"""
+    field = rule.get("field")
+    max_value = rule.get("value", float('inf'))
+    if data.get(field, 0) > max_value:
+        return f"Field '{field}' must not exceed {max_value}"
+    return None
+
+
+# Rule evaluators keyed by rule type; each returns a failure message or None.
+# Unknown rule types always pass.
+_RULE_CHECKS = {
+    "required_field": _check_required_field,
+    "min_value": _check_min_value,
+    "max_value": _check_max_value,
+}
+
+# Rules applied when the caller passes none
+_DEFAULT_RULES = {
+    "01/GTGT": [
+        {"id": "vat_001", "type": "required_field", "field": "tax_code"},
+        {"id": "vat_002", "type": "required_field", "field": "company_name"},
+        {"id": "vat_003", "type": "min_value", "field": "total_revenue", "value": 0}
+    ],
+    "03/TNDN": [
+        {"id": "corp_001", "type": "required_field", "field": "tax_code"},
+        {"id": "corp_002", "type": "required_field", "field": "company_name"}
+    ],
+}
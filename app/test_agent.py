@@ -10,47 +10,64 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-try:
-    print("🔍 Testing agent import...")
-    import agent
+
+def _get_subs(root) -> list:
+    """Return the agent's sub-agents under either attribute name ADK has used"""
+    return getattr(root, 'sub_agents', None) or getattr(root, 'subagents', None) or []
+
+
+def _emit(lines: list) -> None:
+    """Write the collected report lines to stdout in one call"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    out = []
+    try:
+        out.append("🔍 Testing agent import...")
+        import agent
     
-    print(f"✅ Agent imported successfully")
-    print(f"📋 Agent name: {agent.root_agent.name}")
-    print(f"🤖 Agent model: {agent.root_agent.model}")
+        out.append(f"✅ Agent imported successfully")
+        out.append(f"📋 Agent name: {agent.root_agent.name}")
+        out.append(f"🤖 Agent model: {agent.root_agent.model}")
     
-    # Check if sub_agents exist
-    if hasattr(agent.root_agent, 'sub_agents') and agent.root_agent.sub_agents:
-        print(f"✅ Sub-agents found: {len(agent.root_agent.sub_agents)}")
-        for i, subagent in enumerate(agent.root_agent.sub_agents):
-            print(f"  {i+1}. {subagent.name} - {subagent.description[:50]}...")
-    elif hasattr(agent.root_agent, 'subagents') and agent.root_agent.subagents:
-        print(f"✅ Subagents found: {len(agent.root_agent.subagents)}")
-        for i, subagent in enumerate(agent.root_agent.subagents):
-            print(f"  {i+1}. {subagent.name} - {subagent.description[:50]}...")
-    else:
-        print("❌ No sub-agents found!")
+        # Check if sub_agents exist
+        subagents = _get_subs(agent.root_agent)
+        if subagents:
+            out.append(f"✅ Sub-agents found: {len(subagents)}")
+            for i, subagent in enumerate(subagents):
+                out.append(f"  {i+1}. {subagent.name} - {subagent.description[:50]}...")
+        else:
+            out.append("❌ No sub-agents found!")
         
-    # Test individual subagent imports
-    print("\n🔍 Testing individual subagent imports...")
+        # Test individual subagent imports
+        out.append("\n🔍 Testing individual subagent imports...")
     
-    try:
-        from htkk_agents.sub_agents.form_agent import form_agent
-        print(f"✅ Form agent: {form_agent.name}")
-    except Exception as e:
-        print(f"❌ Form agent error: {e}")
+        try:
+            from htkk_agents.sub_agents.form_agent import form_agent
+            out.append(f"✅ Form agent: {form_agent.name}")
+        except Exception as e:
+            out.append(f"❌ Form agent error: {e}")
         
-    try:
-        from htkk_agents.sub_agents.ocr_agent import ocr_agent
-        print(f"✅ OCR agent: {ocr_agent.name}")
-    except Exception as e:
-        print(f"❌ OCR agent error: {e}")
+        try:
+            from htkk_agents.sub_agents.ocr_agent import ocr_agent
+            out.append(f"✅ OCR agent: {ocr_agent.name}")
+        except Exception as e:
+            out.append(f"❌ OCR agent error: {e}")
         
-    # Tax validator agent has been merged into form_agent
-    print("ℹ️  Tax validator functionality merged into form_agent")
+        # Tax validator agent has been merged into form_agent
+        out.append("ℹ️  Tax validator functionality merged into form_agent")
         
-    print("\n🎉 Agent configuration test completed!")
+        out.append("\n🎉 Agent configuration test completed!")
+        _emit(out)
     
-except Exception as e:
-    print(f"❌ Error importing agent: {e}")
-    import traceback
-    traceback.print_exc()
+    except Exception as e:
+        out.append(f"❌ Error importing agent: {e}")
+        _emit(out)
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    main()
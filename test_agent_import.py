@@ -2,36 +2,38 @@
 """
 Test script to debug ADK agent import issues
 """
+import importlib
 import sys
 import os
 
-print("Python path:")
-for path in sys.path:
-    print(f"  {path}")
+out = ["Python path:"]
+out.extend(f"  {path}" for path in sys.path)
 
-print(f"\nCurrent working directory: {os.getcwd()}")
+out.append(f"\nCurrent working directory: {os.getcwd()}")
 
+# Import backend.agent once; the package-level alias is checked through
+# sys.modules instead of importing the same tree again
 try:
-    print("\n1. Testing 'import backend'...")
-    import backend
-    print(f"   ✅ Success: backend module loaded")
-    print(f"   ✅ backend.root_agent: {backend.root_agent.name}")
+    out.append("\n1. Testing 'import backend.agent'...")
+    agent_module = importlib.import_module("backend.agent")
+    ra = agent_module.root_agent
+    out.append(f"   ✅ Success: root_agent imported from backend.agent")
+    out.append(f"   ✅ root_agent.name: {ra.name}")
 except Exception as e:
-    print(f"   ❌ Error: {e}")
+    ra = None
+    out.append(f"   ❌ Error: {e}")
 
 try:
-    print("\n2. Testing 'from backend import root_agent'...")
-    from backend import root_agent
-    print(f"   ✅ Success: root_agent imported")
-    print(f"   ✅ root_agent.name: {root_agent.name}")
+    out.append("\n2. Testing 'backend.root_agent'...")
+    backend = sys.modules.get("backend") or importlib.import_module("backend")
+    root_agent = backend.root_agent
+    out.append(f"   ✅ Success: backend module loaded")
+    out.append(f"   ✅ backend.root_agent: {root_agent.name}")
+    if ra is not None:
+        out.append(f"   {'✅' if root_agent is ra else '❌'} Same object as backend.agent.root_agent")
 except Exception as e:
-    print(f"   ❌ Error: {e}")
-
-try:
-    print("\n3. Testing 'from backend.agent import root_agent'...")
-    from backend.agent import root_agent as ra
-    print(f"   ✅ Success: root_agent imported from backend.agent")
-    print(f"   ✅ root_agent.name: {ra.name}")
-except Exception as e:
-    print(f"   ❌ Error: {e}")
+    out.append(f"   ❌ Error: {e}")
 
+# Emit the whole report in one write
+sys.stdout.write("\n".join(out) + "\n")
+sys.stdout.flush()